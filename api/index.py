@@ -16,11 +16,22 @@ from flask import Flask, request, jsonify, redirect
 from flask_cors import CORS
 from flasgger import Swagger
 from datetime import datetime, timezone, timedelta
+from werkzeug.exceptions import RequestEntityTooLarge
 from src.services.contact_service import ContactService
+from src.services.form_profiles import FormBusyError
+from src.logging_config import setup_logging
+from src.uploads import UploadRequest, MAX_TOTAL_SIZE, collect_attachments
+
+# Structured JSON logs, written off the request thread
+setup_logging()
 
 # Create Flask app
 app = Flask(__name__)
 
+# Stream uploads to size-capped spooled files; cap the whole request body
+app.request_class = UploadRequest
+app.config['MAX_CONTENT_LENGTH'] = MAX_TOTAL_SIZE
+
 # CORS Configuration - Allow specific origins
 CORS(app, 
      origins=["https://www.niteshnandan.in", "https://niteshnandan.in", "http://localhost:3000", "http://localhost:5173"],
@@ -42,12 +53,21 @@ Swagger(app)
 contact_service = ContactService()
 
 
-@app.route('/api/contact', methods=['POST', 'OPTIONS'])
-def contact_me():
+@app.route('/api/contact', methods=['POST', 'OPTIONS'], defaults={'form_id': None})
+@app.route('/api/contact/<form_id>', methods=['POST', 'OPTIONS'])
+def contact_me(form_id):
     """Submit contact form
     ---
     tags:
       - Contact
+    description: >
+      Accepts JSON, or multipart/form-data with the same fields plus
+      files in one or more `attachments` parts. The form is selected by
+      the path segment (`/api/contact/<form_id>`) or a `form_id` field;
+      fields depend on the form, those below are the default form's.
+    consumes:
+      - application/json
+      - multipart/form-data
     parameters:
       - in: body
         name: body
@@ -72,50 +92,62 @@ def contact_me():
             message:
               type: string
               example: I would like to know more about your services
+            form_id:
+              type: string
+              example: default
     responses:
       201:
         description: Success
       400:
         description: Validation error
+      404:
+        description: Unknown form
+      413:
+        description: Attachment too large
       500:
         description: Server error
+      503:
+        description: Form busy, retry later
     """
     # Handle preflight OPTIONS request
     if request.method == 'OPTIONS':
         return '', 204
     
     try:
-        data = request.get_json()
+        attachments = []
+        if request.mimetype == 'multipart/form-data':
+            data = request.form
+            attachments = collect_attachments(request)
+        else:
+            data = request.get_json()
         if not data:
             return jsonify({'success': False, 'error': 'No data provided'}), 400
         
-        # Validate
-        required = ['name', 'email', 'subject', 'message']
-        missing = [f for f in required if not data.get(f)]
-        if missing:
-            return jsonify({'success': False, 'error': f"Missing: {', '.join(missing)}"}), 400
-        
-        # Clean data
-        name = data.get('name', '').strip()
-        email = data.get('email', '').strip()
-        subject = data.get('subject', '').strip()
-        message = data.get('message', '').strip()
+        # Select form profile
+        profile = contact_service.get_profile(form_id or data.get('form_id'))
+        if profile is None:
+            return jsonify({'success': False, 'error': 'Unknown form'}), 404
         
-        # Validate email
-        if '@' not in email or '.' not in email:
-            return jsonify({'success': False, 'error': 'Invalid email'}), 400
+        # Validate and clean data
+        fields, error = profile.validate(data)
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
         
         # Process
         success, result = contact_service.process_submission(
-            name=name,
-            email=email,
-            subject=subject,
-            message=message,
-            ip_address=request.remote_addr or 'Unknown'
+            fields=fields,
+            ip_address=request.remote_addr or 'Unknown',
+            attachments=attachments,
+            profile=profile
         )
         
         return jsonify(result), 201 if success else 500
         
+    except FormBusyError as e:
+        error = 'Too many submissions right now, please try again shortly'
+        return jsonify({'success': False, 'error': error}), 503, {'Retry-After': str(e.retry_after)}
+    except RequestEntityTooLarge as e:
+        return jsonify({'success': False, 'error': e.description}), 413
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -8,11 +8,21 @@ import sys
 # Add current directory to Python path for Vercel serverless
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from src.services import ContactService
+from werkzeug.exceptions import RequestEntityTooLarge
+from src.services import ContactService, FormBusyError
+from src.logging_config import setup_logging
+from src.uploads import UploadRequest, MAX_TOTAL_SIZE, collect_attachments
+
+# Structured JSON logs, written off the request thread
+setup_logging()
 
 app = Flask(__name__)
 CORS(app)
 
+# Stream uploads to size-capped spooled files; cap the whole request body
+app.request_class = UploadRequest
+app.config['MAX_CONTENT_LENGTH'] = MAX_TOTAL_SIZE
+
 # Note: The 'app' variable is used by Vercel for serverless deployment
 
 # Simple Swagger configuration
@@ -28,12 +38,21 @@ Swagger(app)
 contact_service = ContactService()
 
 
-@app.route('/api/contact', methods=['POST'])
-def contact_me():
+@app.route('/api/contact', methods=['POST'], defaults={'form_id': None})
+@app.route('/api/contact/<form_id>', methods=['POST'])
+def contact_me(form_id):
     """Submit a contact form message
     ---
     tags:
       - Contact
+    description: >
+      Accepts JSON, or multipart/form-data with the same fields plus
+      files in one or more `attachments` parts. The form is selected by
+      the path segment (`/api/contact/<form_id>`) or a `form_id` field;
+      fields depend on the form, those below are the default form's.
+    consumes:
+      - application/json
+      - multipart/form-data
     parameters:
       - in: body
         name: body
@@ -58,42 +77,59 @@ def contact_me():
             message:
               type: string
               example: I would like to know more about your services.
+            form_id:
+              type: string
+              example: default
     responses:
       201:
         description: Contact form submitted successfully
       400:
         description: Validation error
+      404:
+        description: Unknown form
+      413:
+        description: Attachment too large
       500:
         description: Server error
+      503:
+        description: Form busy, retry later
     """
     try:
-        data = request.get_json()
-        
-        # Validate required fields
-        required_fields = ['name', 'email', 'subject', 'message']
-        missing_fields = [field for field in required_fields if not data.get(field)]
+        attachments = []
+        if request.mimetype == 'multipart/form-data':
+            data = request.form
+            attachments = collect_attachments(request)
+        else:
+            data = request.get_json()
         
-        if missing_fields:
-            return jsonify({'success': False, 'error': f"Missing required fields: {', '.join(missing_fields)}"}), 400
+        if not data:
+            return jsonify({'success': False, 'error': 'No data provided'}), 400
         
-        # Extract and clean form data
-        name = data.get('name', '').strip()
-        email = data.get('email', '').strip()
-        subject = data.get('subject', '').strip()
-        message = data.get('message', '').strip()
+        # Select the form profile from the path or the payload
+        profile = contact_service.get_profile(form_id or data.get('form_id'))
+        if profile is None:
+            return jsonify({'success': False, 'error': 'Unknown form'}), 404
         
-        # Basic email validation
-        if '@' not in email or '.' not in email:
-            return jsonify({'success': False, 'error': 'Invalid email address'}), 400
+        # Validate and clean form data against the profile's fields
+        fields, error = profile.validate(data)
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
         
         # Process submission
         success, result = contact_service.process_submission(
-            name=name, email=email, subject=subject, message=message,
-            ip_address=request.remote_addr or 'Unknown'
+            fields=fields,
+            ip_address=request.remote_addr or 'Unknown',
+            attachments=attachments,
+            profile=profile
         )
         
         return jsonify(result), 201 if success else 500
         
+    except FormBusyError as e:
+        error = 'Too many submissions right now, please try again shortly'
+        return jsonify({'success': False, 'error': error}), 503, {'Retry-After': str(e.retry_after)}
+    except RequestEntityTooLarge as e:
+        return jsonify({'success': False, 'error': e.description}), 413
     except Exception as e:
         return jsonify({'success': False, 'error': f'Server error: {str(e)}'}), 500
 
@@ -158,6 +194,7 @@ def main():
         print(f"✉️  Email: ENABLED ✓")
     else:
         print(f"⚠️  Email: DISABLED")
+    print(f"📝 Forms:       {', '.join(contact_service.profiles)}")
     print(f"{'='*55}\n")
     
     app.run(host='0.0.0.0', port=port, debug=debug)
@@ -1,29 +1,42 @@
 #!/usr/bin/env python3
 """
-Script to preview email templates in the browser.
-Usage: python preview_template.py
+Local preview server for email templates.
+
+Renders through ContactService, the same path used in production, and
+reloads the browser whenever a file in src/email_templates changes.
+Form profiles are loaded without SMTP senders, so no secrets are needed.
+
+Usage:
+    python preview_template.py                  # serve on http://localhost:8001
+    python preview_template.py --port 9000 --no-browser
+    python preview_template.py --form portfolio # preview a form's template and fields
+    python preview_template.py --bench 1000     # benchmark rendering
 """
 
-from pathlib import Path
-from datetime import datetime
+import argparse
+import json
+import random
+import string
+import time
+import tracemalloc
 import webbrowser
-import tempfile
-
-def preview_contact_form_template():
-    """Generate and open preview of the contact form email template."""
-    
-    # Load the template
-    template_path = Path(__file__).parent / "src" / "email_templates" / "contact_form.html"
-    
-    with open(template_path, 'r') as f:
-        template = f.read()
-    
-    # Sample data
-    sample_data = {
-        'name': 'John Doe',
-        'email': 'john.doe@example.com',
-        'subject': 'Inquiry About Your Services',
-        'message': '''Hello,
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import parse_qs, urlparse
+
+from src.services import ContactService, FormProfile, load_form_profiles
+from src.services.contact_service import STANDARD_FIELDS, TEMPLATE_DIR
+from src.services.form_profiles import DEFAULT_FORM_ID
+
+RELOAD_POLL_MS = 1000
+
+SAMPLE_SUBMISSION = {
+    'name': 'John Doe',
+    'email': 'john.doe@example.com',
+    'subject': 'Inquiry About Your Services',
+    'message': '''Hello,
 
 I came across your website and I'm very interested in learning more about your services. I have a project that I think would be a great fit for your expertise.
 
@@ -33,23 +46,15 @@ Looking forward to hearing from you!
 
 Best regards,
 John''',
-        'timestamp': datetime.now().strftime('%B %d, %Y at %I:%M %p IST'),
-        'ip_address': '192.168.1.100'
-    }
-    
-    # Render the template (simple string replacement to avoid CSS brace conflicts)
-    rendered_html = template
-    for key, value in sample_data.items():
-        rendered_html = rendered_html.replace(f'{{{key}}}', str(value))
-    
-    # Wrap in a container for better preview
-    preview_html = f"""
-<!DOCTYPE html>
+    'ip_address': '192.168.1.100'
+}
+
+PREVIEW_PAGE = """<!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Contact Form Email Preview</title>
+    <title>Email Preview - {template}</title>
     <style>
         body {{
             font-family: Arial, sans-serif;
@@ -78,34 +83,283 @@ John''',
 <body>
     <div class="preview-note">
         <h3 style="margin: 0 0 10px 0;">📧 Email Template Preview</h3>
-        <p style="margin: 0; font-size: 14px;">This is how your contact form notification email will appear</p>
+        <p style="margin: 0; font-size: 14px;">Reloads automatically when templates change</p>
         <p style="margin: 10px 0 0 0; font-size: 12px; color: #666;">
-            Template: <code>src/email_templates/contact_form.html</code>
+            Template: <code>src/email_templates/{template}</code> &middot; rendered in {render_ms:.2f} ms
         </p>
     </div>
 
     <div class="email-container">
-        {rendered_html}
+        {html}
     </div>
+
+    <script>
+        const version = {version};
+        setInterval(async () => {{
+            try {{
+                const res = await fetch('/__version');
+                if ((await res.json()).version !== version) location.reload();
+            }} catch (e) {{}}
+        }}, {poll_ms});
+    </script>
 </body>
 </html>
 """
-    
-    # Save to temporary file and open in browser
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False) as f:
-        f.write(preview_html)
-        temp_path = f.name
-    
-    print(f"✓ Preview generated: {temp_path}")
-    print(f"🌐 Opening in browser...")
-    
-    # Open in default browser
-    webbrowser.open(f'file://{temp_path}')
-    
-    print(f"✓ Preview opened in browser!")
-    print(f"\nNote: The temporary file will remain at: {temp_path}")
-    print(f"You can delete it manually or it will be cleaned up by the system.")
 
-if __name__ == "__main__":
-    preview_contact_form_template()
 
+def templates_version(template_dir: Path) -> int:
+    """
+    Fingerprint the template directory so changes can be detected.
+
+    Args:
+        template_dir: Directory holding the email templates
+
+    Returns:
+        Hash of every file's name, size and modification time
+    """
+    entries = sorted(
+        (p.name, p.stat().st_size, p.stat().st_mtime_ns)
+        for p in template_dir.iterdir() if p.is_file()
+    )
+    return hash(tuple(entries)) & 0x7FFFFFFF
+
+
+def preview_service() -> ContactService:
+    """Build a ContactService that can render every form but never sends."""
+    return ContactService(load_form_profiles(TEMPLATE_DIR, with_senders=False))
+
+
+def sample_submission(profile: FormProfile) -> Dict:
+    """
+    Build the preview submission for a form, with a fresh timestamp.
+
+    Args:
+        profile: Form whose fields are filled in
+
+    Returns:
+        Submission with sample values for every field of the form
+    """
+    ist = timezone(timedelta(hours=5, minutes=30))
+    submission = {
+        spec.name: SAMPLE_SUBMISSION.get(spec.name, f"Sample {spec.name}")
+        for spec in profile.fields
+    }
+    submission['ip_address'] = SAMPLE_SUBMISSION['ip_address']
+    submission['timestamp'] = datetime.now(ist).isoformat()
+    return submission
+
+
+def make_handler(service: ContactService, profile: FormProfile):
+    """
+    Build a request handler bound to a ContactService.
+
+    Args:
+        service: Service whose rendering path is previewed
+        profile: Form whose template and fields are rendered
+
+    Returns:
+        BaseHTTPRequestHandler subclass
+    """
+
+    class PreviewHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == '/__version':
+                body = json.dumps({'version': templates_version(service.template_dir)})
+                self._respond(200, 'application/json', body)
+            elif url.path == '/':
+                template = parse_qs(url.query).get('template', [profile.template])[0]
+                self._render(Path(template).name)
+            else:
+                self._respond(404, 'text/plain', 'Not found')
+
+        def _render(self, template: str):
+            try:
+                started = time.perf_counter()
+                html, _ = service.render_notification(sample_submission(profile), template)
+                render_ms = (time.perf_counter() - started) * 1000
+            except FileNotFoundError:
+                self._respond(404, 'text/plain', f"Template not found: {template}")
+                return
+
+            page = PREVIEW_PAGE.format(
+                template=template,
+                html=html,
+                render_ms=render_ms,
+                version=templates_version(service.template_dir),
+                poll_ms=RELOAD_POLL_MS
+            )
+            self._respond(200, 'text/html; charset=utf-8', page)
+
+        def _respond(self, status: int, content_type: str, body: str):
+            data = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.send_header('Cache-Control', 'no-store')
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            if not self.path.startswith('/__version'):
+                super().log_message(format, *args)
+
+    return PreviewHandler
+
+
+def serve(service: ContactService, profile: FormProfile, port: int, open_browser: bool = True):
+    """
+    Run the preview server until interrupted.
+
+    Args:
+        service: Service used for rendering
+        profile: Form to preview
+        port: Local port to listen on
+        open_browser: Open the preview in the default browser
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(service, profile))
+    url = f"http://localhost:{port}/"
+
+    print(f"✓ Preview server running at {url} (form '{profile.form_id}')")
+    print(f"👀 Watching {service.template_dir} for changes (Ctrl+C to stop)")
+    if open_browser:
+        webbrowser.open(url)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n✓ Preview server stopped")
+    finally:
+        server.server_close()
+
+
+def _random_text(rng: random.Random, length: int, alphabet: str) -> str:
+    words = []
+    size = 0
+    while size < length:
+        word = ''.join(rng.choices(alphabet, k=rng.randint(1, 12)))
+        words.append(word)
+        size += len(word) + 1
+    return ' '.join(words)[:length]
+
+
+def random_submissions(count: int, seed: int = 0, extra_fields: Sequence[str] = ()) -> List[Dict]:
+    """
+    Generate randomized submissions, including large and unicode messages.
+
+    Args:
+        count: Number of submissions
+        seed: Random seed for reproducible runs
+        extra_fields: Form-specific field names to fill with random text
+
+    Returns:
+        List of submission dictionaries
+    """
+    rng = random.Random(seed)
+    ascii_alphabet = string.ascii_letters + string.digits
+    unicode_alphabet = ascii_alphabet + 'éüñçøåßдждяאבג中文日本語한국어🙂📧🚀'
+    ist = timezone(timedelta(hours=5, minutes=30))
+
+    submissions = []
+    for _ in range(count):
+        alphabet = rng.choice([ascii_alphabet, unicode_alphabet])
+        # Mostly short messages, with a tail of very large ones
+        length = rng.choice([200, 2_000, 20_000, 200_000]) if rng.random() < 0.2 else rng.randint(20, 1_000)
+        submission = {
+            'name': _random_text(rng, rng.randint(3, 40), alphabet),
+            'email': f"{_random_text(rng, 10, ascii_alphabet).replace(' ', '.')}@example.com",
+            'subject': _random_text(rng, rng.randint(5, 120), alphabet),
+            'message': _random_text(rng, length, alphabet + '\n'),
+            'timestamp': datetime.now(ist).isoformat(),
+            'ip_address': f"10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+        }
+        for name in extra_fields:
+            submission[name] = _random_text(rng, rng.randint(1, 100), alphabet)
+        submissions.append(submission)
+    return submissions
+
+
+def bench(
+    service: ContactService,
+    profile: FormProfile,
+    count: int,
+    template: Optional[str] = None,
+    seed: int = 0
+):
+    """
+    Render randomized submissions and report throughput and peak memory.
+
+    Args:
+        service: Service used for rendering
+        profile: Form whose extra fields are filled in
+        count: Number of submissions to render
+        template: Template file to render (the form's template if not provided)
+        seed: Random seed for the generated submissions
+    """
+    template = template or profile.template
+    extra_fields = [spec.name for spec in profile.fields if spec.name not in STANDARD_FIELDS]
+    submissions = random_submissions(count, seed, extra_fields)
+    input_bytes = sum(len(s['message'].encode('utf-8')) for s in submissions)
+
+    # Warm up file system caches before measuring
+    service.render_notification(submissions[0], template)
+
+    # Timing pass, untraced: tracemalloc would roughly halve throughput
+    durations = []
+    output_bytes = 0
+    started = time.perf_counter()
+    for submission in submissions:
+        mark = time.perf_counter()
+        html, text = service.render_notification(submission, template)
+        durations.append(time.perf_counter() - mark)
+        output_bytes += len(html.encode('utf-8')) + len(text.encode('utf-8'))
+    total = time.perf_counter() - started
+
+    # Separate pass for peak memory
+    tracemalloc.start()
+    for submission in submissions:
+        service.render_notification(submission, template)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    durations.sort()
+    p95 = durations[min(int(len(durations) * 0.95), len(durations) - 1)]
+
+    print(f"\n{'='*55}")
+    print(f"📊 Render benchmark: {template} (form '{profile.form_id}')")
+    print(f"{'='*55}")
+    print(f"Submissions:     {count} (seed {seed}, {input_bytes / 1024:.1f} KB of messages)")
+    print(f"Renders/sec:     {count / total:,.1f}")
+    print(f"Mean/p95/max:    {total / count * 1000:.3f} / {p95 * 1000:.3f} / {durations[-1] * 1000:.3f} ms")
+    print(f"Output:          {output_bytes / count / 1024:.1f} KB per render on average")
+    print(f"Peak memory:     {peak / (1024 * 1024):.2f} MB")
+    print(f"{'='*55}\n")
+
+
+def main():
+    """Parse arguments and run the preview server or benchmark."""
+    parser = argparse.ArgumentParser(description="Preview and benchmark email templates")
+    parser.add_argument('--port', type=int, default=8001, help="Preview server port")
+    parser.add_argument('--no-browser', action='store_true', help="Don't open a browser")
+    parser.add_argument('--bench', type=int, metavar='N', help="Render N randomized submissions and report timings")
+    parser.add_argument('--form', default=DEFAULT_FORM_ID, help="Form profile to preview or benchmark")
+    parser.add_argument('--template', help="Template to benchmark (defaults to the form's template)")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed for --bench")
+    args = parser.parse_args()
+
+    if args.bench is not None and args.bench < 1:
+        parser.error("--bench N must be at least 1")
+
+    service = preview_service()
+    profile = service.get_profile(args.form)
+    if profile is None:
+        parser.error(f"unknown form '{args.form}' (available: {', '.join(sorted(service.profiles))})")
+
+    if args.bench is not None:
+        bench(service, profile, args.bench, args.template, args.seed)
+    else:
+        serve(service, profile, args.port, open_browser=not args.no_browser)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Structured, non-blocking logging for My Mailer.
+
+Request threads only enqueue records through a ``QueueHandler``; a background
+listener drains the queue in batches and writes them as JSON lines.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import List, Optional, TextIO
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LOGGER_NAME = 'my_mailer'
+
+# Attributes every LogRecord carries; anything else was passed via ``extra``
+_RESERVED_ATTRS = frozenset(
+    vars(logging.LogRecord('', 0, '', 0, '', None, None)).keys()
+) | {'message', 'asctime', 'taskName'}
+
+_listener: Optional['BatchQueueListener'] = None
+_setup_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        Serialize a record, including any fields passed via ``extra``.
+
+        Args:
+            record: Log record to format
+
+        Returns:
+            JSON string without a trailing newline
+        """
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep a fraction of low-severity records; warnings always pass.
+
+    Records carrying a ``submission_id`` are sampled per submission, so all
+    records of one submission are kept or dropped together.
+    """
+
+    def __init__(self, rate: float = 1.0):
+        """
+        Initialize SamplingFilter.
+
+        Args:
+            rate: Fraction (0.0-1.0) of INFO/DEBUG records to keep
+        """
+        super().__init__()
+        self.rate = min(max(rate, 0.0), 1.0)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.rate >= 1.0:
+            return True
+        submission_id = getattr(record, 'submission_id', None)
+        if submission_id:
+            # Stable across threads and processes, unlike hash()
+            bucket = zlib.crc32(str(submission_id).encode('utf-8')) / 0x100000000
+            return bucket < self.rate
+        return random.random() < self.rate
+
+
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps exception info for the JSON formatter."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Make a record safe to hand to another thread.
+
+        The message is merged with its args, but unlike the stdlib version
+        the traceback is rendered into ``exc`` instead of the message text.
+        """
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+            record.exc_text = None
+        return record
+
+
+class BatchQueueListener:
+    """Background thread that drains a log queue and writes records in batches."""
+
+    _SENTINEL = None
+
+    def __init__(
+        self,
+        log_queue: queue.Queue,
+        stream: TextIO,
+        formatter: logging.Formatter,
+        batch_size: int = 100,
+        flush_interval: float = 0.5
+    ):
+        """
+        Initialize BatchQueueListener.
+
+        Args:
+            log_queue: Queue fed by a QueueHandler
+            stream: Stream the JSON lines are written to
+            formatter: Formatter applied to each record
+            batch_size: Maximum number of records per write
+            flush_interval: Seconds to wait for new records before flushing
+        """
+        self.queue = log_queue
+        self.stream = stream
+        self.formatter = formatter
+        self.batch_size = max(batch_size, 1)
+        self.flush_interval = flush_interval
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the listener thread."""
+        self._thread = threading.Thread(
+            target=self._run, name='my-mailer-log-listener', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Flush pending records and stop the listener thread."""
+        if self._thread is None:
+            return
+        self.queue.put_nowait(self._SENTINEL)
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        running = True
+        while running:
+            batch: List[logging.LogRecord] = []
+            try:
+                record = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            # Drain whatever else is already waiting, up to the batch size
+            while record is not self._SENTINEL:
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    record = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            else:
+                running = False
+
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch: List[logging.LogRecord]) -> None:
+        lines = []
+        for record in batch:
+            try:
+                lines.append(self.formatter.format(record))
+            except Exception:
+                continue  # Never let a bad record kill the listener
+        try:
+            self.stream.write('\n'.join(lines) + '\n')
+            self.stream.flush()
+        except Exception:
+            pass
+
+
+def setup_logging(
+    level: Optional[str] = None,
+    sample_rate: Optional[float] = None,
+    batch_size: Optional[int] = None,
+    stream: Optional[TextIO] = None
+) -> logging.Logger:
+    """
+    Configure the application logger. Safe to call more than once.
+
+    Args:
+        level: Log level name (from LOG_LEVEL env var if not provided)
+        sample_rate: Fraction of INFO/DEBUG records kept (from LOG_SAMPLE_RATE)
+        batch_size: Records per write (from LOG_BATCH_SIZE)
+        stream: Output stream (defaults to stdout)
+
+    Returns:
+        The configured application logger
+    """
+    global _listener
+
+    logger = logging.getLogger(LOGGER_NAME)
+    with _setup_lock:
+        if _listener is not None:
+            return logger
+
+        level = level or os.getenv('LOG_LEVEL', 'INFO')
+        if sample_rate is None:
+            sample_rate = float(os.getenv('LOG_SAMPLE_RATE', '1.0'))
+        if batch_size is None:
+            batch_size = int(os.getenv('LOG_BATCH_SIZE', '100'))
+
+        log_queue: queue.Queue = queue.Queue(-1)
+        handler = StructuredQueueHandler(log_queue)
+        handler.addFilter(SamplingFilter(sample_rate))
+
+        logger.handlers.clear()
+        logger.addHandler(handler)
+        logger.setLevel(level.upper())
+        logger.propagate = False
+
+        _listener = BatchQueueListener(
+            log_queue,
+            stream or sys.stdout,
+            JsonFormatter(),
+            batch_size=batch_size
+        )
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+    return logger
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the background listener."""
+    global _listener
+
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Get a child of the application logger.
+
+    Args:
+        name: Module name, e.g. ``__name__``
+
+    Returns:
+        Logger under the ``my_mailer`` hierarchy
+    """
+    return logging.getLogger(f"{LOGGER_NAME}.{name.rsplit('.', 1)[-1]}")
+
+
+def elapsed_ms(start: float) -> float:
+    """
+    Milliseconds elapsed since a ``time.perf_counter()`` reading.
+
+    Args:
+        start: Value previously returned by ``time.perf_counter()``
+
+    Returns:
+        Elapsed time in milliseconds, rounded to two decimals
+    """
+    return round((time.perf_counter() - start) * 1000, 2)
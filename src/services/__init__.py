@@ -2,8 +2,13 @@
 Services module for My Mailer
 """
 
+from .attachments import Attachment
 from .email_sender import EmailSender
+from .form_profiles import FormBusyError, FormProfile, load_form_profiles
 from .contact_service import ContactService
 
-__all__ = ['EmailSender', 'ContactService']
+__all__ = [
+    'Attachment', 'EmailSender', 'FormBusyError', 'FormProfile', 'load_form_profiles',
+    'ContactService'
+]
 
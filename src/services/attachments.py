@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+File attachments for contact form submissions.
+"""
+
+import base64
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator
+
+# 57 raw bytes encode to one 76-character base64 line (RFC 2045)
+BASE64_LINE_BYTES = 57
+BASE64_CHUNK_LINES = 128
+
+
+@dataclass
+class Attachment:
+    """An uploaded file, backed by a (possibly spooled) binary stream."""
+
+    filename: str
+    content_type: str
+    stream: BinaryIO
+    size: int = 0
+
+    def iter_base64(self, lines_per_chunk: int = BASE64_CHUNK_LINES) -> Iterator[bytes]:
+        """
+        Encode the attachment as base64 lines, one chunk at a time.
+
+        Only ``lines_per_chunk * 57`` raw bytes are held in memory at once.
+
+        Args:
+            lines_per_chunk: Number of 76-character lines per yielded chunk
+
+        Yields:
+            CRLF-terminated base64 lines
+        """
+        chunk_size = BASE64_LINE_BYTES * max(lines_per_chunk, 1)
+        self.stream.seek(0)
+        while True:
+            chunk = self.stream.read(chunk_size)
+            if not chunk:
+                break
+            yield base64.encodebytes(chunk).replace(b'\n', b'\r\n')
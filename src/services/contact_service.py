@@ -3,59 +3,115 @@
 Contact form service for handling submissions and notifications.
 """
 
+import re
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Tuple
-from .email_sender import EmailSender
+from typing import Dict, List, Mapping, Optional, Tuple
+from .attachments import Attachment
+from .form_profiles import DEFAULT_FORM_ID, FormBusyError, FormProfile, load_form_profiles
+from ..logging_config import elapsed_ms, get_logger
+
+logger = get_logger(__name__)
+
+TEMPLATE_DIR = Path(__file__).parent.parent / "email_templates"
+
+# Fields rendered explicitly by the templates and the plain text body
+STANDARD_FIELDS = ('name', 'email', 'subject', 'message', 'timestamp', 'ip_address')
+
+# A {field} placeholder; CSS rule bodies contain whitespace and never match
+_PLACEHOLDER_PATTERN = re.compile(r'\{([^{}\s]+)\}')
 
 
 class ContactService:
     """Service for handling contact form submissions."""
     
-    def __init__(self):
-        """Initialize ContactService."""
-        self.email_sender = EmailSender()
-        self.template_dir = Path(__file__).parent.parent / "email_templates"
+    def __init__(self, profiles: Optional[Mapping[str, FormProfile]] = None):
+        """
+        Initialize ContactService.
+        
+        Args:
+            profiles: Form profiles by form_id (loaded from FORMS_CONFIG if not provided)
+        """
+        self.template_dir = TEMPLATE_DIR
+        self.profiles = profiles if profiles is not None else load_form_profiles(self.template_dir)
+        self.email_sender = self.profiles[DEFAULT_FORM_ID].email_sender
+    
+    def get_profile(self, form_id: Optional[object] = None) -> Optional[FormProfile]:
+        """
+        Look up a form profile.
+        
+        Args:
+            form_id: Form identifier (the default form if not provided)
+            
+        Returns:
+            The FormProfile, or None if the form is unknown or form_id is
+            not a string (e.g. a list or object from a JSON body)
+        """
+        if form_id is None:
+            return self.profiles[DEFAULT_FORM_ID]
+        if not isinstance(form_id, str):
+            return None
+        return self.profiles.get(form_id or DEFAULT_FORM_ID)
     
     def process_submission(
         self,
-        name: str,
-        email: str,
-        subject: str,
-        message: str,
-        ip_address: str = "Unknown"
+        fields: Dict[str, str],
+        ip_address: str = "Unknown",
+        attachments: Optional[List[Attachment]] = None,
+        profile: Optional[FormProfile] = None
     ) -> Tuple[bool, Dict]:
         """
         Process a contact form submission.
         
         Args:
-            name: Sender's name
-            email: Sender's email
-            subject: Message subject
-            message: Message content
+            fields: Validated form fields (see FormProfile.validate)
             ip_address: Sender's IP address
+            attachments: Uploaded files to forward with the notification
+            profile: Form the submission belongs to (the default form if not provided)
             
         Returns:
             Tuple of (success, result_dict)
+            
+        Raises:
+            FormBusyError: If the form has no free delivery slot; callers
+                should answer 503 with a Retry-After header
         """
+        profile = profile or self.profiles[DEFAULT_FORM_ID]
+        started = time.perf_counter()
+        timings = {}
+        
+        # Generate submission ID from timestamp
+        submission_id = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        
         try:
             # Create submission object with IST timezone
             from datetime import timezone, timedelta
             ist = timezone(timedelta(hours=5, minutes=30))
             submission = {
-                'name': name,
-                'email': email,
-                'subject': subject,
-                'message': message,
+                **fields,
                 'timestamp': datetime.now(ist).isoformat(),
                 'ip_address': ip_address
             }
+            attachments = attachments or []
             
             # Send email notification
-            email_sent = self._send_notification(submission)
+            email_sent = self._send_notification(
+                submission, submission_id, timings, attachments, profile
+            )
             
-            # Generate submission ID from timestamp
-            submission_id = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+            timings['total_ms'] = elapsed_ms(started)
+            logger.info(
+                "Submission processed",
+                extra={
+                    'submission_id': submission_id,
+                    'form_id': profile.form_id,
+                    'outcome': 'email_sent' if email_sent else 'email_skipped',
+                    'attachments': len(attachments),
+                    'attachment_bytes': sum(a.size for a in attachments),
+                    'timings': timings
+                }
+            )
             
             return True, {
                 'success': True,
@@ -64,37 +120,129 @@ class ContactService:
                 'email_sent': email_sent
             }
             
+        except FormBusyError:
+            timings['total_ms'] = elapsed_ms(started)
+            logger.warning(
+                "Submission rejected - form busy",
+                extra={
+                    'submission_id': submission_id,
+                    'form_id': profile.form_id,
+                    'outcome': 'busy',
+                    'timings': timings
+                }
+            )
+            raise
+            
         except Exception as e:
+            timings['total_ms'] = elapsed_ms(started)
+            logger.exception(
+                "Submission failed",
+                extra={
+                    'submission_id': submission_id,
+                    'form_id': profile.form_id,
+                    'outcome': 'error',
+                    'timings': timings
+                }
+            )
             return False, {
                 'success': False,
                 'error': f'Failed to process submission: {str(e)}'
             }
     
-    def _send_notification(self, submission: Dict) -> bool:
+    def _send_notification(
+        self,
+        submission: Dict,
+        submission_id: Optional[str] = None,
+        timings: Optional[Dict] = None,
+        attachments: Optional[List[Attachment]] = None,
+        profile: Optional[FormProfile] = None
+    ) -> bool:
         """
         Send email notification for the submission.
         
+        Deliveries are limited per form by the profile's delivery slots. When
+        they are all taken the submission is rejected at once (or after the
+        profile's short queue_timeout), so a burst on one form cannot tie up
+        the workers shared with other forms.
+        
         Args:
             submission: Submission data dictionary
+            submission_id: Submission ID used to correlate log records
+            timings: Optional dict that receives per-stage timings in ms
+            attachments: Files to attach to the notification
+            profile: Form the submission belongs to (the default form if not provided)
             
         Returns:
             True if email sent successfully, False otherwise
+            
+        Raises:
+            FormBusyError: If no delivery slot frees up within the queue timeout
         """
-        if not self.email_sender.is_configured():
-            print("⚠️  Email not configured - skipping notification")
+        if timings is None:
+            timings = {}
+        profile = profile or self.profiles[DEFAULT_FORM_ID]
+        email_sender = profile.email_sender
+        
+        if email_sender is None or not email_sender.is_configured():
+            logger.warning(
+                "Email not configured - skipping notification",
+                extra={'submission_id': submission_id, 'form_id': profile.form_id}
+            )
             return False
         
         # Load and populate template
-        html_body = self._render_template('contact_form.html', submission)
-        text_body = self._create_text_body(submission)
+        mark = time.perf_counter()
+        html_body, text_body = self.render_notification(submission, profile.template)
+        timings['render_ms'] = elapsed_ms(mark)
+        
+        # Take a delivery slot on this form, failing fast when it is saturated
+        mark = time.perf_counter()
+        if profile.queue_timeout > 0:
+            acquired = profile.delivery_slots.acquire(timeout=profile.queue_timeout)
+        else:
+            acquired = profile.delivery_slots.acquire(blocking=False)
+        if not acquired:
+            raise FormBusyError(profile.form_id)
+        timings['queue_ms'] = elapsed_ms(mark)
         
         # Send email
-        email_subject = f"New Contact Form: {submission.get('subject', 'No Subject')}"
-        return self.email_sender.send_email(
-            subject=email_subject,
-            html_body=html_body,
-            text_body=text_body,
-            reply_to=submission.get('email')
+        try:
+            mark = time.perf_counter()
+            email_subject = f"{profile.subject_prefix}: {submission.get('subject', 'No Subject')}"
+            sent = email_sender.send_email(
+                subject=email_subject,
+                html_body=html_body,
+                text_body=text_body,
+                reply_to=submission.get('email'),
+                submission_id=submission_id,
+                attachments=attachments
+            )
+            timings['send_ms'] = elapsed_ms(mark)
+        finally:
+            profile.delivery_slots.release()
+        return sent
+    
+    def render_notification(
+        self,
+        submission: Dict,
+        template_name: str = 'contact_form.html'
+    ) -> Tuple[str, str]:
+        """
+        Render the HTML and plain text bodies of a notification email.
+        
+        Templates are read from disk on every call, so edits take effect
+        without a restart.
+        
+        Args:
+            submission: Submission data dictionary
+            template_name: Name of the HTML template file
+            
+        Returns:
+            Tuple of (html_body, text_body)
+        """
+        return (
+            self._render_template(template_name, submission),
+            self._create_text_body(submission)
         )
     
     def _render_template(self, template_name: str, data: Dict) -> str:
@@ -128,16 +276,25 @@ class ContactService:
         
         # Use simple string replacement to avoid conflicts with CSS braces
         replacements = {
-            '{name}': data.get('name', 'Unknown'),
-            '{email}': data.get('email', 'Unknown'),
-            '{subject}': data.get('subject', 'No Subject'),
-            '{message}': data.get('message', 'No message provided'),
-            '{timestamp}': timestamp_str,
-            '{ip_address}': data.get('ip_address', 'Unknown')
+            'name': data.get('name', 'Unknown'),
+            'email': data.get('email', 'Unknown'),
+            'subject': data.get('subject', 'No Subject'),
+            'message': data.get('message', 'No message provided'),
+            'timestamp': timestamp_str,
+            'ip_address': data.get('ip_address', 'Unknown')
         }
         
-        for placeholder, value in replacements.items():
-            template = template.replace(placeholder, str(value))
+        # Form-specific fields use the same {field} placeholder syntax
+        for key, value in data.items():
+            if key not in STANDARD_FIELDS:
+                replacements[key] = value
+        
+        # Single pass over the raw template, so placeholders typed by the
+        # visitor inside a submitted value are never expanded
+        template = _PLACEHOLDER_PATTERN.sub(
+            lambda m: str(replacements[m.group(1)]) if m.group(1) in replacements else m.group(0),
+            template
+        )
         
         return template
     
@@ -164,6 +321,14 @@ class ContactService:
             except:
                 pass
         
+        # Form-specific fields are listed after the message
+        extra_fields = ''.join(
+            f"{key}: {value}\n"
+            for key, value in submission.items()
+            if key not in STANDARD_FIELDS
+        )
+        extra_section = f"\n{extra_fields}" if extra_fields else ""
+        
         return f"""
 New Contact Form Submission
 
@@ -173,7 +338,7 @@ Subject: {submission.get('subject', 'No Subject')}
 
 Message:
 {submission.get('message', 'No message provided')}
-
+{extra_section}
 ---
 Submitted: {timestamp_str}
 IP Address: {submission.get('ip_address', 'Unknown')}
@@ -3,59 +3,101 @@
 Email sending service using Gmail SMTP.
 """
 
+import io
+import re
 import smtplib
 import os
+import time
+from email import policy
+from email.generator import BytesGenerator
+from email.message import EmailMessage
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Optional
+from typing import List, Optional, Sequence, Tuple
 from dotenv import load_dotenv
+from .attachments import Attachment
+from ..logging_config import elapsed_ms, get_logger
 
 load_dotenv()
 
+logger = get_logger(__name__)
+
 
 class EmailSender:
     """A class to handle email sending via Gmail SMTP."""
     
-    def __init__(self, username: Optional[str] = None, password: Optional[str] = None):
+    def __init__(
+        self,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        smtp_host: str = 'smtp.gmail.com',
+        smtp_port: int = 587,
+        recipient_email: Optional[str] = None,
+        use_env_defaults: bool = True,
+        smtp_timeout: float = 30.0
+    ):
         """
         Initialize EmailSender for Gmail.
         
         Args:
             username: Gmail address (from EMAIL_USERNAME env var if not provided)
             password: Gmail app password (from EMAIL_PASSWORD env var if not provided)
+            smtp_host: SMTP relay host
+            smtp_port: SMTP relay port (STARTTLS)
+            recipient_email: Notification recipient (from RECIPIENT_EMAIL env var,
+                then the username, if not provided)
+            use_env_defaults: Fall back to the EMAIL_USERNAME, EMAIL_PASSWORD and
+                RECIPIENT_EMAIL env vars. Disable for relays other than the
+                global one, so its credentials are never sent elsewhere.
+            smtp_timeout: Socket timeout in seconds for the SMTP connection
         """
-        self.username = username or os.getenv('EMAIL_USERNAME')
-        self.password = password or os.getenv('EMAIL_PASSWORD')
-        self.smtp_host = 'smtp.gmail.com'
-        self.smtp_port = 587
-        self.recipient_email = os.getenv('RECIPIENT_EMAIL', self.username)
+        if use_env_defaults:
+            username = username or os.getenv('EMAIL_USERNAME')
+            password = password or os.getenv('EMAIL_PASSWORD')
+            recipient_email = recipient_email or os.getenv('RECIPIENT_EMAIL')
+        self.username = username
+        self.password = password
+        self.smtp_host = smtp_host
+        self.smtp_port = smtp_port
+        self.smtp_timeout = smtp_timeout
+        self.recipient_email = recipient_email or self.username
     
     def send_email(
         self,
         subject: str,
         html_body: str,
         text_body: str,
-        reply_to: Optional[str] = None
+        reply_to: Optional[str] = None,
+        submission_id: Optional[str] = None,
+        attachments: Optional[Sequence[Attachment]] = None
     ) -> bool:
         """
         Send an email with both HTML and plain text versions.
         
+        Attachments are base64-encoded in chunks while the message is
+        written to the SMTP socket, so they are never fully held in memory.
+        
         Args:
             subject: Email subject
             html_body: HTML email body
             text_body: Plain text email body
             reply_to: Reply-to email address
+            submission_id: Submission ID used to correlate log records
+            attachments: Files to attach to the message
             
         Returns:
             True if email sent successfully, False otherwise
         """
+        log_fields = {'submission_id': submission_id}
         if not self.username or not self.password:
-            print("✗ Email credentials not configured")
+            logger.warning("Email credentials not configured", extra=log_fields)
             return False
         
+        timings = {}
+        started = time.perf_counter()
         try:
             # Create message
-            msg = MIMEMultipart('alternative')
+            msg = MIMEMultipart('mixed' if attachments else 'alternative')
             msg['From'] = f"My Website <{self.username}>"
             msg['To'] = self.recipient_email
             msg['Subject'] = subject
@@ -66,22 +108,107 @@ class EmailSender:
             # Attach both plain text and HTML versions
             part1 = MIMEText(text_body, 'plain')
             part2 = MIMEText(html_body, 'html')
-            msg.attach(part1)
-            msg.attach(part2)
+            if attachments:
+                body = MIMEMultipart('alternative')
+                body.attach(part1)
+                body.attach(part2)
+                msg.attach(body)
+            else:
+                msg.attach(part1)
+                msg.attach(part2)
             
             # Send email
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
+            mark = time.perf_counter()
+            with smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=self.smtp_timeout) as server:
+                timings['connect_ms'] = elapsed_ms(mark)
+                mark = time.perf_counter()
                 server.starttls()
                 server.login(self.username, self.password)
-                server.send_message(msg)
+                timings['auth_ms'] = elapsed_ms(mark)
+                mark = time.perf_counter()
+                if attachments:
+                    self._send_streaming(server, msg, attachments)
+                else:
+                    server.send_message(msg)
+                timings['send_ms'] = elapsed_ms(mark)
             
-            print(f"✓ Email sent successfully to {self.recipient_email}")
+            timings['total_ms'] = elapsed_ms(started)
+            logger.info(
+                "Email sent",
+                extra={
+                    **log_fields,
+                    'outcome': 'sent',
+                    'attachments': len(attachments or ()),
+                    'timings': timings
+                }
+            )
             return True
             
         except Exception as e:
-            print(f"✗ Failed to send email: {str(e)}")
+            timings['total_ms'] = elapsed_ms(started)
+            logger.error(
+                "Failed to send email",
+                exc_info=True,
+                extra={
+                    **log_fields,
+                    'outcome': 'failed',
+                    'error': str(e),
+                    'timings': timings
+                }
+            )
             return False
     
+    def _send_streaming(
+        self,
+        server: smtplib.SMTP,
+        msg: MIMEMultipart,
+        attachments: Sequence[Attachment]
+    ) -> None:
+        """
+        Send a message over an open connection, streaming attachments.
+        
+        Args:
+            server: Authenticated SMTP connection
+            msg: multipart/mixed message holding headers and body
+            attachments: Files appended as base64 parts while sending
+        
+        Raises:
+            smtplib.SMTPException: If the server rejects the message
+        """
+        # Render every header up front so nothing but attachment reads can
+        # fail once the server is in DATA mode
+        head, parts, closing = _prepare_message(msg, attachments)
+        
+        server.ehlo_or_helo_if_needed()
+        code, resp = server.mail(self.username)
+        if code != 250:
+            raise smtplib.SMTPSenderRefused(code, resp, self.username)
+        code, resp = server.rcpt(self.recipient_email)
+        if code not in (250, 251):
+            raise smtplib.SMTPRecipientsRefused({self.recipient_email: (code, resp)})
+        code, resp = server.docmd('DATA')
+        if code != 354:
+            raise smtplib.SMTPDataError(code, resp)
+        
+        try:
+            server.send(head)
+            for part_headers, attachment in parts:
+                server.send(part_headers)
+                # Base64 lines never start with '.', so no dot-stuffing is needed
+                for chunk in attachment.iter_base64():
+                    server.send(chunk)
+                server.send(b'\r\n')
+            server.send(closing + b'.\r\n')
+        except Exception:
+            # Mid-DATA the server would read QUIT as message text and never
+            # answer, so drop the connection instead of closing politely
+            server.close()
+            raise
+        
+        code, resp = server.getreply()
+        if code != 250:
+            raise smtplib.SMTPDataError(code, resp)
+    
     def is_configured(self) -> bool:
         """
         Check if email credentials are configured.
@@ -91,3 +218,41 @@ class EmailSender:
         """
         return bool(self.username and self.password)
 
+
+def _prepare_message(
+    msg: MIMEMultipart,
+    attachments: Sequence[Attachment]
+) -> Tuple[bytes, List[Tuple[bytes, Attachment]], bytes]:
+    """
+    Serialize everything but the attachment payloads for the SMTP DATA command.
+    
+    The headers and text/HTML body are rendered by the email package;
+    attachment payloads are left to be base64-encoded while sending.
+    
+    Args:
+        msg: multipart/mixed message holding headers and body
+        attachments: Files to append as parts
+        
+    Returns:
+        Tuple of (head, [(part_headers, attachment), ...], closing_delimiter),
+        all dot-stuffed and CRLF-terminated
+    """
+    buffer = io.BytesIO()
+    BytesGenerator(buffer, mangle_from_=False, policy=msg.policy.clone(linesep='\r\n')).flatten(msg)
+    boundary = msg.get_boundary().encode('ascii')
+    
+    # Drop the closing delimiter; attachment parts go in front of it
+    head, _, _ = buffer.getvalue().rpartition(b'--' + boundary + b'--')
+    head = re.sub(rb'(?m)^\.', b'..', head)
+    
+    parts = []
+    for attachment in attachments:
+        part = EmailMessage(policy=policy.SMTP)
+        content_type = attachment.content_type if '/' in attachment.content_type else 'application/octet-stream'
+        part['Content-Type'] = content_type
+        part['Content-Transfer-Encoding'] = 'base64'
+        part.add_header('Content-Disposition', 'attachment', filename=attachment.filename)
+        headers = b''.join(policy.SMTP.fold_binary(name, value) for name, value in part.items())
+        parts.append((b'--' + boundary + b'\r\n' + headers + b'\r\n', attachment))
+    
+    return head, parts, b'--' + boundary + b'--\r\n'
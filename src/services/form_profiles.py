@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Per-form configuration for serving several sites from one deployment.
+
+Profiles are read once at startup from a JSON file (``FORMS_CONFIG``,
+relative to the project root, default ``forms.json`` there) and compiled into an immutable
+``form_id -> FormProfile`` table, so requests never parse configuration.
+"""
+
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Pattern, Tuple
+from dotenv import load_dotenv
+from .email_sender import EmailSender
+
+load_dotenv()
+
+DEFAULT_FORM_ID = 'default'
+DEFAULT_TEMPLATE = 'contact_form.html'
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_CONFIG_PATH = PROJECT_ROOT / 'forms.json'
+
+_FORM_ID_PATTERN = re.compile(r'[a-z0-9_-]+')
+
+# Filled in by the service for every submission, or used for routing;
+# a form field with one of these names would be silently overwritten
+RESERVED_FIELD_NAMES = frozenset({'timestamp', 'ip_address', 'form_id'})
+
+# A busy form must answer quickly rather than hold a shared worker,
+# so the wait for a delivery slot is capped well below a typical send
+MAX_QUEUE_TIMEOUT = 1.0
+BUSY_RETRY_AFTER = 5
+
+_JSON_TYPE_NAMES = {
+    dict: 'an object', list: 'an array', str: 'a string',
+    int: 'an integer', float: 'a number', bool: 'a boolean', type(None): 'null',
+}
+
+
+class FormBusyError(Exception):
+    """Raised when a form has no free delivery slot within its queue timeout."""
+
+    def __init__(self, form_id: str, retry_after: int = BUSY_RETRY_AFTER):
+        super().__init__(f"Form '{form_id}' is busy")
+        self.form_id = form_id
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """A single form field and its validation rules."""
+
+    name: str
+    required: bool = True
+    kind: str = 'text'
+    max_length: Optional[int] = None
+    pattern: Optional[Pattern] = None
+
+    def validate(self, value: str) -> Optional[str]:
+        """
+        Validate a cleaned, non-empty field value.
+
+        Args:
+            value: Stripped field value
+
+        Returns:
+            Error message, or None if the value is valid
+        """
+        if self.max_length is not None and len(value) > self.max_length:
+            return f"{self.name} must be at most {self.max_length} characters"
+        if self.kind == 'email' and ('@' not in value or '.' not in value):
+            return 'Invalid email address'
+        if self.pattern is not None and not self.pattern.fullmatch(value):
+            return f"Invalid {self.name}"
+        return None
+
+
+DEFAULT_FIELDS = (
+    FieldSpec('name'),
+    FieldSpec('email', kind='email'),
+    FieldSpec('subject'),
+    FieldSpec('message'),
+)
+
+
+@dataclass(frozen=True)
+class FormProfile:
+    """Compiled configuration for one contact form."""
+
+    form_id: str
+    fields: Tuple[FieldSpec, ...]
+    template: str
+    # None when loaded without senders, e.g. for previewing templates
+    email_sender: Optional[EmailSender] = field(default=None, compare=False, repr=False)
+    subject_prefix: str = 'New Contact Form'
+    max_concurrent: int = 4
+    queue_timeout: float = 0.0
+    delivery_slots: threading.BoundedSemaphore = field(
+        init=False, compare=False, repr=False
+    )
+
+    def __post_init__(self):
+        # Frozen dataclass: set the derived semaphore via object.__setattr__
+        object.__setattr__(
+            self, 'delivery_slots', threading.BoundedSemaphore(self.max_concurrent)
+        )
+
+    def validate(self, data: Mapping) -> Tuple[Dict[str, str], Optional[str]]:
+        """
+        Clean and validate submitted data against this form's fields.
+
+        Args:
+            data: Raw request data (JSON object or form fields)
+
+        Returns:
+            Tuple of (cleaned_fields, error); error is None if valid.
+            Fields not declared by the profile are dropped.
+        """
+        cleaned = {}
+        for spec in self.fields:
+            value = data.get(spec.name)
+            cleaned[spec.name] = str(value).strip() if value is not None else ''
+
+        missing = [s.name for s in self.fields if s.required and not cleaned[s.name]]
+        if missing:
+            return cleaned, f"Missing required fields: {', '.join(missing)}"
+
+        for spec in self.fields:
+            if cleaned[spec.name]:
+                error = spec.validate(cleaned[spec.name])
+                if error:
+                    return cleaned, error
+
+        return cleaned, None
+
+
+def load_form_profiles(
+    template_dir: Path,
+    config_path: Optional[Path] = None,
+    with_senders: bool = True
+) -> Mapping[str, FormProfile]:
+    """
+    Load and compile all form profiles.
+
+    A ``default`` profile matching the original single-form behaviour
+    (fields, template and EMAIL_*/RECIPIENT_EMAIL settings) is always
+    available unless the config file overrides it.
+
+    Args:
+        template_dir: Directory holding the email templates
+        config_path: Profiles JSON file (from FORMS_CONFIG env var if not provided,
+            relative to the project root)
+        with_senders: Build each profile's EmailSender. Pass False to only
+            render templates; SMTP secrets are then not required.
+
+    Returns:
+        Read-only mapping of form_id to FormProfile
+
+    Raises:
+        ValueError: If the config file is invalid, or was set explicitly
+            but does not exist
+    """
+    path = config_path
+    if path is None and os.getenv('FORMS_CONFIG'):
+        path = Path(os.environ['FORMS_CONFIG'])
+        if not path.is_absolute():
+            path = PROJECT_ROOT / path
+
+    if path is not None and not path.is_file():
+        raise ValueError(f"Forms config not found: {path}")
+    path = path or DEFAULT_CONFIG_PATH
+
+    config = {}
+    if path.is_file():
+        with open(path, 'r') as f:
+            config = json.load(f)
+        if not isinstance(config, dict):
+            raise ValueError(f"{path}: expected an object of form_id -> profile")
+
+    profiles = {
+        form_id: _build_profile(form_id, options, template_dir, with_senders)
+        for form_id, options in config.items()
+    }
+    if DEFAULT_FORM_ID not in profiles:
+        profiles[DEFAULT_FORM_ID] = _build_profile(DEFAULT_FORM_ID, {}, template_dir, with_senders)
+
+    return MappingProxyType(profiles)
+
+
+def _build_profile(
+    form_id: str,
+    options: Dict,
+    template_dir: Path,
+    with_senders: bool = True
+) -> FormProfile:
+    if not isinstance(form_id, str) or not _FORM_ID_PATTERN.fullmatch(form_id):
+        raise ValueError(f"Invalid form_id '{form_id}': use lowercase letters, digits, '-' or '_'")
+    _check_type(form_id, 'profile', options, dict)
+
+    if 'fields' in options:
+        _check_type(form_id, 'fields', options['fields'], list)
+        fields = tuple(_build_field(form_id, spec) for spec in options['fields'])
+        if not fields:
+            raise ValueError(f"Form '{form_id}': 'fields' must not be empty")
+        names = [spec.name for spec in fields]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Form '{form_id}': duplicate field names")
+    else:
+        fields = DEFAULT_FIELDS
+
+    template = _check_type(form_id, 'template', options.get('template', DEFAULT_TEMPLATE), str)
+    if not (template_dir / template).is_file():
+        raise ValueError(f"Form '{form_id}': template not found: {template}")
+
+    recipient = _check_type(form_id, 'recipient', options.get('recipient'), str, optional=True)
+    if not recipient and form_id != DEFAULT_FORM_ID:
+        raise ValueError(f"Form '{form_id}': 'recipient' is required")
+
+    if not with_senders:
+        sender = None
+    elif 'smtp' in options:
+        sender = _build_sender(form_id, options['smtp'], recipient)
+    else:
+        # Global EMAIL_* relay and credentials
+        sender = EmailSender(recipient_email=recipient)
+
+    subject_prefix = _check_type(
+        form_id, 'subject_prefix', options.get('subject_prefix', 'New Contact Form'), str
+    )
+
+    if 'max_concurrent' in options:
+        max_concurrent = _check_type(form_id, 'max_concurrent', options['max_concurrent'], int)
+    else:
+        max_concurrent = int(os.getenv('FORM_MAX_CONCURRENT', '4'))
+    if max_concurrent < 1:
+        raise ValueError(f"Form '{form_id}': max_concurrent must be at least 1")
+
+    queue_timeout = float(_check_type(
+        form_id, 'queue_timeout', options.get('queue_timeout', 0.0), (int, float)
+    ))
+    if not 0 <= queue_timeout <= MAX_QUEUE_TIMEOUT:
+        raise ValueError(
+            f"Form '{form_id}': queue_timeout must be between 0 and {MAX_QUEUE_TIMEOUT} seconds"
+        )
+
+    return FormProfile(
+        form_id=form_id,
+        fields=fields,
+        template=template,
+        email_sender=sender,
+        subject_prefix=subject_prefix,
+        max_concurrent=max_concurrent,
+        queue_timeout=queue_timeout
+    )
+
+
+def _build_sender(form_id: str, smtp: Dict, recipient: Optional[str]) -> EmailSender:
+    _check_type(form_id, 'smtp', smtp, dict)
+
+    # Secrets are referenced by env var name, never stored in the config file.
+    # No fallback to the global EMAIL_* credentials: they must never reach
+    # another relay.
+    username = _check_type(form_id, 'smtp.username', smtp.get('username'), str, optional=True)
+    username = username or _require_env(form_id, smtp, 'username_env')
+    password = _require_env(form_id, smtp, 'password_env')
+    if not recipient:
+        recipient = os.getenv('RECIPIENT_EMAIL')  # Only reachable for the default form
+
+    port = _check_type(form_id, 'smtp.port', smtp.get('port', 587), int)
+    if not 0 < port < 65536:
+        raise ValueError(f"Form '{form_id}': smtp.port must be between 1 and 65535")
+
+    return EmailSender(
+        username=username,
+        password=password,
+        smtp_host=_check_type(form_id, 'smtp.host', smtp.get('host', 'smtp.gmail.com'), str),
+        smtp_port=port,
+        recipient_email=recipient,
+        use_env_defaults=False
+    )
+
+
+def _require_env(form_id: str, smtp: Dict, key: str) -> str:
+    name = _check_type(form_id, f"smtp.{key}", smtp.get(key), str, optional=True)
+    if not name:
+        raise ValueError(f"Form '{form_id}': smtp.{key} is required")
+    value = os.getenv(name)
+    if not value:
+        raise ValueError(f"Form '{form_id}': env var {name} (smtp.{key}) is not set")
+    return value
+
+
+def _build_field(form_id: str, spec) -> FieldSpec:
+    if isinstance(spec, str):
+        spec = {'name': spec}
+    if not isinstance(spec, dict) or 'name' not in spec:
+        raise ValueError(f"Form '{form_id}': each field needs a 'name'")
+
+    name = _check_type(form_id, 'field name', spec['name'], str)
+    where = f"field '{name}'"
+    if name in RESERVED_FIELD_NAMES:
+        raise ValueError(f"Form '{form_id}': {where}: name is reserved")
+
+    kind = spec.get('type', 'text')
+    if kind not in ('text', 'email'):
+        raise ValueError(f"Form '{form_id}': {where}: unknown type '{kind}'")
+
+    required = _check_type(form_id, f"{where} required", spec.get('required', True), bool)
+
+    max_length = _check_type(
+        form_id, f"{where} max_length", spec.get('max_length'), int, optional=True
+    )
+    if max_length is not None and max_length < 1:
+        raise ValueError(f"Form '{form_id}': {where}: max_length must be at least 1")
+
+    pattern = _check_type(form_id, f"{where} pattern", spec.get('pattern'), str, optional=True)
+    try:
+        compiled = re.compile(pattern) if pattern else None
+    except re.error as e:
+        raise ValueError(f"Form '{form_id}': {where}: invalid pattern: {e}") from e
+
+    return FieldSpec(
+        name=name,
+        required=required,
+        kind=kind,
+        max_length=max_length,
+        pattern=compiled
+    )
+
+
+def _check_type(form_id: str, name: str, value, expected, optional: bool = False):
+    """Return a config value, or raise ValueError if its JSON type is wrong."""
+    if value is None and optional:
+        return value
+    types = expected if isinstance(expected, tuple) else (expected,)
+    # JSON booleans are ints in Python; only accept them where bool is expected
+    is_bool_mismatch = isinstance(value, bool) and bool not in types
+    if not isinstance(value, types) or is_bool_mismatch:
+        if types == (int, float):
+            type_names = 'a number'
+        else:
+            type_names = ' or '.join(_JSON_TYPE_NAMES.get(t, t.__name__) for t in types)
+        actual = _JSON_TYPE_NAMES.get(type(value), type(value).__name__)
+        raise ValueError(f"Form '{form_id}': {name} must be {type_names}, got {actual}")
+    return value
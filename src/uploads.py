@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Streaming multipart uploads for the contact form.
+
+Uploaded files are written straight to spooled temporary files while the
+request body is parsed, with per-file and total size caps.
+"""
+
+import os
+from tempfile import SpooledTemporaryFile
+from typing import List, Optional
+from flask import Request
+from werkzeug.exceptions import RequestEntityTooLarge
+from dotenv import load_dotenv
+from .services.attachments import Attachment
+
+load_dotenv()
+
+# Files stay in memory up to this size, then roll over to disk
+SPOOL_MAX_MEMORY = 512 * 1024
+MAX_FILE_SIZE = int(os.getenv('ATTACHMENT_MAX_FILE_SIZE', str(10 * 1024 * 1024)))
+MAX_TOTAL_SIZE = int(os.getenv('ATTACHMENT_MAX_TOTAL_SIZE', str(20 * 1024 * 1024)))
+ATTACHMENT_FIELD = 'attachments'
+
+
+def format_size(size: int) -> str:
+    """
+    Format a byte count for error messages.
+
+    Args:
+        size: Number of bytes
+
+    Returns:
+        Size in bytes, KB or MB with one decimal, e.g. ``'1.5 MB'``
+    """
+    if size < 1024:
+        return f"{size} bytes"
+    if size < 1024 * 1024:
+        return f"{size / 1024:.1f} KB"
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+class SizeLimitedSpooledFile(SpooledTemporaryFile):
+    """SpooledTemporaryFile that refuses to grow beyond a size cap."""
+
+    def __init__(self, max_file_size: int, filename: Optional[str] = None):
+        """
+        Initialize SizeLimitedSpooledFile.
+
+        Args:
+            max_file_size: Maximum number of bytes that may be written
+            filename: Upload filename, used in the error message
+        """
+        super().__init__(max_size=SPOOL_MAX_MEMORY, mode='w+b')
+        self.max_file_size = max_file_size
+        self.filename = filename
+        self.bytes_written = 0
+
+    def write(self, data) -> int:
+        self.bytes_written += len(data)
+        if self.bytes_written > self.max_file_size:
+            raise RequestEntityTooLarge(
+                f"Attachment '{self.filename or 'file'}' exceeds "
+                f"{format_size(self.max_file_size)}"
+            )
+        return super().write(data)
+
+
+class UploadRequest(Request):
+    """Flask request that streams file uploads into size-capped spooled files."""
+
+    max_file_size = MAX_FILE_SIZE
+
+    def _get_file_stream(
+        self,
+        total_content_length: Optional[int],
+        content_type: Optional[str],
+        filename: Optional[str] = None,
+        content_length: Optional[int] = None
+    ):
+        return SizeLimitedSpooledFile(self.max_file_size, filename)
+
+
+def collect_attachments(request: Request) -> List[Attachment]:
+    """
+    Collect uploaded files from a multipart request.
+
+    Args:
+        request: Current Flask request
+
+    Returns:
+        List of attachments; empty if no files were uploaded
+    """
+    attachments = []
+    for upload in request.files.getlist(ATTACHMENT_FIELD):
+        if not upload or not upload.filename:
+            continue
+
+        stream = upload.stream
+        size = getattr(stream, 'bytes_written', None)
+        if size is None:
+            stream.seek(0, os.SEEK_END)
+            size = stream.tell()
+
+        # Keep only the base name; browsers may send full client paths
+        filename = os.path.basename(upload.filename.replace('\\', '/'))
+        attachments.append(Attachment(
+            filename=filename or 'attachment',
+            content_type=upload.mimetype or 'application/octet-stream',
+            stream=stream,
+            size=size
+        ))
+    return attachments
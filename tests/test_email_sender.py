@@ -0,0 +1,152 @@
+"""
+Tests for EmailSender's streaming attachment path against a fake SMTP server.
+"""
+
+import email
+import io
+import os
+import re
+import socket
+import threading
+import time
+import unittest
+from email import policy
+from unittest import mock
+
+from src.services.attachments import Attachment
+from src.services.email_sender import EmailSender
+
+
+class FakeSMTPServer:
+    """Minimal plaintext SMTP server that records the DATA payload."""
+
+    def __init__(self):
+        self.sock = socket.socket()
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen(1)
+        self.port = self.sock.getsockname()[1]
+        self.data = None
+        self.aborted = False
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def _serve(self):
+        conn, _ = self.sock.accept()
+        with conn:
+            reader = conn.makefile('rb')
+            reply = lambda line: conn.sendall(line.encode('ascii') + b'\r\n')
+            reply('220 fake ESMTP')
+            while True:
+                line = reader.readline()
+                if not line:
+                    return
+                command = line.strip().upper()
+                if command.startswith(b'EHLO') or command.startswith(b'HELO'):
+                    reply('250 fake')
+                elif command.startswith(b'MAIL') or command.startswith(b'RCPT'):
+                    reply('250 OK')
+                elif command == b'DATA':
+                    reply('354 End data with <CR><LF>.<CR><LF>')
+                    lines = []
+                    while True:
+                        data_line = reader.readline()
+                        if not data_line:
+                            self.aborted = True
+                            return
+                        if data_line == b'.\r\n':
+                            break
+                        lines.append(data_line)
+                    self.data = b''.join(lines)
+                    reply('250 queued')
+                elif command == b'QUIT':
+                    reply('221 bye')
+                    return
+                else:
+                    reply('502 not implemented')
+
+    def close(self):
+        self.thread.join(timeout=5)
+        self.sock.close()
+
+
+class FailingStream(io.BytesIO):
+    """Attachment stream whose reads fail, as a broken spool file would."""
+
+    def read(self, *args):
+        raise OSError("disk read failed")
+
+
+class StreamingSendTests(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeSMTPServer()
+        self.sender = EmailSender(
+            username='site@example.com',
+            password='secret',
+            smtp_host='127.0.0.1',
+            smtp_port=self.server.port,
+            recipient_email='owner@example.com',
+            use_env_defaults=False,
+            smtp_timeout=5
+        )
+        # The fake server speaks plaintext only
+        patcher = mock.patch.multiple(
+            'smtplib.SMTP',
+            starttls=mock.DEFAULT,
+            login=mock.DEFAULT
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.server.close)
+
+    def test_attachments_round_trip(self):
+        payload = os.urandom(300_000)
+        sent = self.sender.send_email(
+            subject='Hello ünïcode',
+            html_body='<p>Hi</p>',
+            text_body='.leading dot\nplain é',
+            reply_to='visitor@example.com',
+            attachments=[
+                Attachment('résumé.pdf', 'application/pdf', io.BytesIO(payload), len(payload)),
+                Attachment('notes.txt', 'not-a-mime-type', io.BytesIO(b'.dot\n'), 5),
+            ]
+        )
+        self.server.close()
+
+        self.assertTrue(sent)
+        self.assertIsNotNone(self.server.data)
+        # Undo SMTP dot-stuffing before parsing
+        raw = re.sub(rb'(?m)^\.\.', b'.', self.server.data)
+        message = email.message_from_bytes(raw, policy=policy.default)
+
+        self.assertEqual(message['Subject'], 'Hello ünïcode')
+        self.assertEqual(message['Reply-To'], 'visitor@example.com')
+        self.assertEqual(message.get_body(('plain',)).get_content(), '.leading dot\nplain é')
+
+        attachments = list(message.iter_attachments())
+        self.assertEqual([a.get_filename() for a in attachments], ['résumé.pdf', 'notes.txt'])
+        self.assertEqual(attachments[0].get_content_type(), 'application/pdf')
+        self.assertEqual(attachments[0].get_content(), payload)
+        self.assertEqual(attachments[1].get_content_type(), 'application/octet-stream')
+        self.assertEqual(attachments[1].get_content(), b'.dot\n')
+
+    def test_failure_mid_data_does_not_hang(self):
+        started = time.monotonic()
+        sent = self.sender.send_email(
+            subject='Broken attachment',
+            html_body='<p>Hi</p>',
+            text_body='Hi',
+            attachments=[Attachment('broken.bin', 'application/octet-stream', FailingStream(), 10)]
+        )
+        elapsed = time.monotonic() - started
+        self.server.close()
+
+        self.assertFalse(sent)
+        self.assertLess(elapsed, 2)
+        # The connection was dropped mid-DATA rather than sent a QUIT
+        self.assertTrue(self.server.aborted)
+        self.assertIsNone(self.server.data)
+
+
+if __name__ == '__main__':
+    unittest.main()